@@ -1,9 +1,65 @@
 from __future__ import annotations
 
-from functools import partial
+from dataclasses import dataclass
+from functools import lru_cache, partial
 
+import awkward as ak
+import dask
 import dask_awkward as dak
+import numpy as np
+import uproot
 from coffea.dataset_tools import apply_to_fileset
+from coffea.lumi_tools import LumiMask
+from dask.diagnostics import ProgressBar
+
+from egamma_tnp.utils import (
+    fill_nd_cutncount_histograms,
+    fill_nd_mll_histograms,
+    fill_pt_eta_phi_cutncount_histograms,
+    fill_pt_eta_phi_mll_histograms,
+)
+from egamma_tnp.utils.histogramming import flatten_array
+from egamma_tnp.utils.misc import find_pt_threshold, split_mask_indices
+
+# a single ProgressBar is reused across computations; registration is what
+# activates it, so sharing the object is safe and skips per-call construction
+_PBAR = ProgressBar()
+
+
+@lru_cache(maxsize=None)
+def _load_lumimask(goldenjson):
+    """Parse a golden JSON into a LumiMask once per path and share it across instances."""
+    return LumiMask(goldenjson)
+
+
+@dataclass(frozen=True)
+class _FlatTnPArrays:
+    """Picklable data manipulation that returns the flattened probes array."""
+
+    tnp: BaseTagNProbe
+    cut_and_count: bool
+    mass_range: int | float | tuple
+    vars: tuple
+
+    def __call__(self, events):
+        vars = list(self.vars) if isinstance(self.vars, tuple) else self.vars
+        return flatten_array(self.tnp.find_probes(events, cut_and_count=self.cut_and_count, mass_range=self.mass_range, vars=vars))
+
+
+@dataclass(frozen=True)
+class _FlatPassingFailingProbes:
+    """Picklable data manipulation that returns flattened passing and failing probes."""
+
+    tnp: BaseTagNProbe
+    filter: str
+    cut_and_count: bool
+    mass_range: int | float | tuple
+    vars: tuple
+
+    def __call__(self, events):
+        vars = list(self.vars) if isinstance(self.vars, tuple) else self.vars
+        p_and_f = self.tnp._make_passing_and_failing_probes(events, self.filter, cut_and_count=self.cut_and_count, mass_range=self.mass_range, vars=vars)
+        return {key: flatten_array(value) for key, value in p_and_f.items()}
 
 
 class BaseTagNProbe:
@@ -34,8 +90,6 @@ class BaseTagNProbe:
             extra_filter_args = {}
         if filters is not None:
             if probes_pt_cut is None and len(filters) == 1:
-                from egamma_tnp.utils.misc import find_pt_threshold
-
                 self.probes_pt_cut = find_pt_threshold(filters[0]) - 3
             elif probes_pt_cut is None and len(filters) > 1:
                 self.probes_pt_cut = 5
@@ -65,8 +119,108 @@ class BaseTagNProbe:
         self.avoid_ecal_transition_probes = avoid_ecal_transition_probes
         self.schemaclass = schemaclass
         self.default_vars = default_vars
+        self._n_files = sum(len(dataset["files"]) for dataset in fileset.values())
+        self._graph_cache = {}
+        self._extra_tags_mask_code = compile(extra_tags_mask, "<extra_tags_mask>", "eval") if extra_tags_mask is not None else None
+        self._extra_probes_mask_code = compile(extra_probes_mask, "<extra_probes_mask>", "eval") if extra_probes_mask is not None else None
+        self._lumimask = _load_lumimask(goldenjson) if goldenjson is not None else None
+
+    def _build_to_compute(self, data_manipulation, uproot_options, cache_key=None):
+        """Build the task graph for a data manipulation over the fileset.
+
+        Building the graph with ``apply_to_fileset`` walks every file in the fileset,
+        so graphs are memoized in ``self._graph_cache`` when a hashable ``cache_key``
+        describing the manipulation is provided. Repeated calls with identical
+        parameters (e.g. once delayed and once computed) then reuse the same graph.
+
+        For filesets made entirely of plain local paths, uproot is told to
+        memory-map the files instead of issuing a blocking read per basket.
+        ``file://`` URIs are left to uproot's own source resolution, since a
+        forced handler receives the path verbatim, scheme included.
+        """
+        if "handler" not in uproot_options and all("://" not in file for dataset in self.fileset.values() for file in dataset["files"]):
+            uproot_options = {**uproot_options, "handler": uproot.MemmapSource}
+        if cache_key is not None:
+            cache_key = (cache_key, repr(uproot_options))
+            if cache_key in self._graph_cache:
+                return self._graph_cache[cache_key]
+
+        to_compute = apply_to_fileset(
+            data_manipulation=data_manipulation,
+            fileset=self.fileset,
+            schemaclass=self.schemaclass,
+            uproot_options=uproot_options,
+        )
+        if cache_key is not None:
+            self._graph_cache[cache_key] = to_compute
+
+        return to_compute
+
+    def _compute(self, to_compute, scheduler, progress):
+        """Compute a task graph, optionally with a progress bar.
+
+        The ``dask.diagnostics.ProgressBar`` only works with the local schedulers,
+        so it is not registered when a distributed client is active.
+        """
+        if progress:
+            try:
+                import distributed
+
+                distributed.get_client()
+                progress = False
+            except (ImportError, ValueError):
+                pass
+
+        if progress:
+            _PBAR.register()
+
+        try:
+            # optimize_graph keeps the dask-awkward column projection and blockwise
+            # fusion active even if a caller changes the global optimization config
+            computed = dask.compute(to_compute, scheduler=scheduler, optimize_graph=True)
+        finally:
+            if progress:
+                _PBAR.unregister()
+
+        return computed[0]
+
+    def _resolve_kwargs(self, cut_and_count, mass_range, vars, uproot_options):
+        """Validate and default the common keyword arguments of the public methods.
 
-    def find_probes(self, events, cut_and_count, mass_range, vars):
+        Returns copies of the mutable arguments so that the returned values can be
+        safely passed around without aliasing ``self.default_vars`` or user-owned lists.
+        """
+        if uproot_options is None:
+            uproot_options = {}
+        mass_range = self._resolve_mass_window(mass_range) if cut_and_count else self._resolve_mass_bounds(mass_range)
+        if vars is None:
+            vars = list(self.default_vars)
+        elif isinstance(vars, list):
+            vars = list(vars)
+
+        return mass_range, vars, uproot_options
+
+    @staticmethod
+    def _resolve_mass_window(mass_range):
+        """Default and validate the mass window around the Z mass used for cut and count efficiencies."""
+        if mass_range is None:
+            return 30
+        if isinstance(mass_range, tuple):
+            raise ValueError("For cut and count efficiencies, mass_range must be a single value representing the mass window around the Z mass.")
+        return mass_range
+
+    @staticmethod
+    def _resolve_mass_bounds(mass_range):
+        """Default and validate the mass bounds used for invariant masses to be fit with a Sig+Bkg model."""
+        if mass_range is None:
+            return (50, 130)
+        if not isinstance(mass_range, tuple):
+            raise ValueError(
+                "For invariant masses to be fit with a Sig+Bkg model, mass_range must be a tuple of two values representing the bounds of the mass range."
+            )
+        return mass_range
+
+    def find_probes(self, events, cut_and_count, mass_range, vars, needed_filters=None):
         """Find the passing and failing probes given some events.
 
         This method will perform the Tag and Probe method given some events and return the passing and failing probe events
@@ -88,11 +242,15 @@ class BaseTagNProbe:
                 For invariant masses to be fit with a Sig+Bkg model, it is a tuple of two values representing the mass range.
             vars : list
                 The list of variables of the probes to return.
+            needed_filters : set of str, optional
+                The filters whose pass/fail flags are actually consumed downstream.
+                If None, the flags of all the filters specified during class initialization are computed.
+                The default is None.
 
         Returns
         _______
             probes : awkward.Array or dask_awarkward.Array
-                An array with fields specified in `vars` and a boolean field for each filter.
+                An array with fields specified in `vars` and a boolean field for each needed filter.
                 Also contains a `pair_mass` field if cut_and_count is False.
         """
         raise NotImplementedError("find_probes method must be implemented.")
@@ -148,50 +306,17 @@ class BaseTagNProbe:
             report: dict of awkward arrays of the same form as fileset.
                 For each dataset an awkward array that contains information about the file access is present.
         """
-        if uproot_options is None:
-            uproot_options = {}
-        if mass_range is None:
-            if cut_and_count:
-                mass_range = 30
-            else:
-                mass_range = (50, 130)
-        if cut_and_count and isinstance(mass_range, tuple):
-            raise ValueError("For cut and count efficiencies, mass_range must be a single value representing the mass window around the Z mass.")
-        if not cut_and_count and not isinstance(mass_range, tuple):
-            raise ValueError(
-                "For invariant masses to be fit with a Sig+Bkg model, mass_range must be a tuple of two values representing the bounds of the mass range."
-            )
-        if vars is None:
-            vars = self.default_vars
+        mass_range, vars, uproot_options = self._resolve_kwargs(cut_and_count=cut_and_count, mass_range=mass_range, vars=vars, uproot_options=uproot_options)
 
         if flat:
-            from egamma_tnp.utils.histogramming import flatten_array
-
-            def data_manipulation(events):
-                return flatten_array(self.find_probes(events, cut_and_count=cut_and_count, mass_range=mass_range, vars=vars))
+            data_manipulation = _FlatTnPArrays(self, cut_and_count=cut_and_count, mass_range=mass_range, vars=tuple(vars) if isinstance(vars, list) else vars)
         else:
             data_manipulation = partial(self.find_probes, cut_and_count=cut_and_count, mass_range=mass_range, vars=vars)
 
-        to_compute = apply_to_fileset(
-            data_manipulation=data_manipulation,
-            fileset=self.fileset,
-            schemaclass=self.schemaclass,
-            uproot_options=uproot_options,
-        )
+        cache_key = ("get_tnp_arrays", cut_and_count, mass_range, tuple(vars) if isinstance(vars, list) else vars, flat)
+        to_compute = self._build_to_compute(data_manipulation, uproot_options, cache_key=cache_key)
         if compute:
-            import dask
-            from dask.diagnostics import ProgressBar
-
-            if progress:
-                pbar = ProgressBar()
-                pbar.register()
-
-            computed = dask.compute(to_compute, scheduler=scheduler)
-
-            if progress:
-                pbar.unregister()
-
-            return computed[0]
+            return self._compute(to_compute, scheduler=scheduler, progress=progress)
 
         return to_compute
 
@@ -252,28 +377,12 @@ class BaseTagNProbe:
         """
         if self.filters is None:
             raise ValueError("filters must be specified during class initialization to use this method.")
-        if uproot_options is None:
-            uproot_options = {}
-        if mass_range is None:
-            if cut_and_count:
-                mass_range = 30
-            else:
-                mass_range = (50, 130)
-        if cut_and_count and isinstance(mass_range, tuple):
-            raise ValueError("For cut and count efficiencies, mass_range must be a single value representing the mass window around the Z mass.")
-        if not cut_and_count and not isinstance(mass_range, tuple):
-            raise ValueError(
-                "For invariant masses to be fit with a Sig+Bkg model, mass_range must be a tuple of two values representing the bounds of the mass range."
-            )
-        if vars is None:
-            vars = self.default_vars
+        mass_range, vars, uproot_options = self._resolve_kwargs(cut_and_count=cut_and_count, mass_range=mass_range, vars=vars, uproot_options=uproot_options)
 
         if flat:
-            from egamma_tnp.utils.histogramming import flatten_array
-
-            def data_manipulation(events):
-                p_and_f = self._make_passing_and_failing_probes(events, filter, cut_and_count=cut_and_count, mass_range=mass_range, vars=vars)
-                return {key: flatten_array(value) for key, value in p_and_f.items()}
+            data_manipulation = _FlatPassingFailingProbes(
+                self, filter=filter, cut_and_count=cut_and_count, mass_range=mass_range, vars=tuple(vars) if isinstance(vars, list) else vars
+            )
         else:
             data_manipulation = partial(
                 self._make_passing_and_failing_probes,
@@ -283,26 +392,10 @@ class BaseTagNProbe:
                 vars=vars,
             )
 
-        to_compute = apply_to_fileset(
-            data_manipulation=data_manipulation,
-            fileset=self.fileset,
-            schemaclass=self.schemaclass,
-            uproot_options=uproot_options,
-        )
+        cache_key = ("get_passing_and_failing_probes", filter, cut_and_count, mass_range, tuple(vars) if isinstance(vars, list) else vars, flat)
+        to_compute = self._build_to_compute(data_manipulation, uproot_options, cache_key=cache_key)
         if compute:
-            import dask
-            from dask.diagnostics import ProgressBar
-
-            if progress:
-                pbar = ProgressBar()
-                pbar.register()
-
-            computed = dask.compute(to_compute, scheduler=scheduler)
-
-            if progress:
-                pbar.unregister()
-
-            return computed[0]
+            return self._compute(to_compute, scheduler=scheduler, progress=progress)
 
         return to_compute
 
@@ -384,21 +477,7 @@ class BaseTagNProbe:
         """
         if self.filters is None:
             raise ValueError("filters must be specified during class initialization to use this method.")
-        if uproot_options is None:
-            uproot_options = {}
-        if mass_range is None:
-            if cut_and_count:
-                mass_range = 30
-            else:
-                mass_range = (50, 130)
-        if cut_and_count and isinstance(mass_range, tuple):
-            raise ValueError("For cut and count efficiencies, mass_range must be a single value representing the mass window around the Z mass.")
-        if not cut_and_count and not isinstance(mass_range, tuple):
-            raise ValueError(
-                "For invariant masses to be fit with a Sig+Bkg model, mass_range must be a tuple of two values representing the bounds of the mass range."
-            )
-        if vars is None:
-            vars = self.default_vars
+        mass_range, vars, uproot_options = self._resolve_kwargs(cut_and_count=cut_and_count, mass_range=mass_range, vars=vars, uproot_options=uproot_options)
 
         if cut_and_count:
             data_manipulation = partial(
@@ -425,26 +504,25 @@ class BaseTagNProbe:
                 eta_regions_phi=eta_regions_phi,
             )
 
-        to_compute = apply_to_fileset(
-            data_manipulation=data_manipulation,
-            fileset=self.fileset,
-            schemaclass=self.schemaclass,
-            uproot_options=uproot_options,
+        import egamma_tnp
+
+        cache_key = (
+            "get_1d_pt_eta_phi_tnp_histograms",
+            filter,
+            cut_and_count,
+            mass_range,
+            tuple(vars) if isinstance(vars, list) else vars,
+            plateau_cut,
+            repr(eta_regions_pt),
+            repr(eta_regions_eta),
+            repr(eta_regions_phi),
+            # the fill helpers read egamma_tnp.binning at graph-build time, so a
+            # cached graph is only valid for the binning revision it was built with
+            egamma_tnp.binning._revision,
         )
+        to_compute = self._build_to_compute(data_manipulation, uproot_options, cache_key=cache_key)
         if compute:
-            import dask
-            from dask.diagnostics import ProgressBar
-
-            if progress:
-                pbar = ProgressBar()
-                pbar.register()
-
-            computed = dask.compute(to_compute, scheduler=scheduler)
-
-            if progress:
-                pbar.unregister()
-
-            return computed[0]
+            return self._compute(to_compute, scheduler=scheduler, progress=progress)
 
         return to_compute
 
@@ -502,21 +580,7 @@ class BaseTagNProbe:
         """
         if self.filters is None:
             raise ValueError("filters must be specified during class initialization to use this method.")
-        if uproot_options is None:
-            uproot_options = {}
-        if mass_range is None:
-            if cut_and_count:
-                mass_range = 30
-            else:
-                mass_range = (50, 130)
-        if cut_and_count and isinstance(mass_range, tuple):
-            raise ValueError("For cut and count efficiencies, mass_range must be a single value representing the mass window around the Z mass.")
-        if not cut_and_count and not isinstance(mass_range, tuple):
-            raise ValueError(
-                "For invariant masses to be fit with a Sig+Bkg model, mass_range must be a tuple of two values representing the bounds of the mass range."
-            )
-        if vars is None:
-            vars = self.default_vars
+        mass_range, vars, uproot_options = self._resolve_kwargs(cut_and_count=cut_and_count, mass_range=mass_range, vars=vars, uproot_options=uproot_options)
 
         if cut_and_count:
             data_manipulation = partial(
@@ -543,51 +607,183 @@ class BaseTagNProbe:
                 eta_regions_phi=None,
             )
 
-        to_compute = apply_to_fileset(
-            data_manipulation=data_manipulation,
-            fileset=self.fileset,
-            schemaclass=self.schemaclass,
-            uproot_options=uproot_options,
-        )
+        import egamma_tnp
+
+        cache_key = ("get_nd_tnp_histograms", filter, cut_and_count, mass_range, tuple(vars) if isinstance(vars, list) else vars, egamma_tnp.binning._revision)
+        to_compute = self._build_to_compute(data_manipulation, uproot_options, cache_key=cache_key)
         if compute:
-            import dask
-            from dask.diagnostics import ProgressBar
+            return self._compute(to_compute, scheduler=scheduler, progress=progress)
 
-            if progress:
-                pbar = ProgressBar()
-                pbar.register()
+        return to_compute
 
-            computed = dask.compute(to_compute, scheduler=scheduler)
+    def get_histograms_multi_filter(
+        self,
+        filters=None,
+        cut_and_count=True,
+        pt_eta_phi_1d=True,
+        mass_range=None,
+        plateau_cut=None,
+        eta_regions_pt=None,
+        eta_regions_eta=None,
+        eta_regions_phi=None,
+        vars=None,
+        uproot_options=None,
+        compute=False,
+        scheduler=None,
+        progress=False,
+    ):
+        """Get the histograms of the passing and failing probes for multiple filters at once.
 
-            if progress:
-                pbar.unregister()
+        The probes are found only once and shared between all requested filters,
+        so the upstream selection and the file reads are not repeated per filter.
+
+        Parameters
+        ----------
+            filters: list of str, optional
+                The filters to check whether the probes pass or not.
+                The default is None, meaning that all the filters specified during class initialization are used.
+            cut_and_count: bool, optional
+                Whether to use the cut and count method to find the probes coming from a Z boson.
+                If False, invariant mass histograms of the tag-probe pairs will be filled to be fit by a Signal+Background model.
+                The default is True.
+            pt_eta_phi_1d: bool, optional
+                Whether to fill 1D Pt, Eta and Phi histograms or N-dimensional histograms.
+                The default is True.
+            mass_range: int or float or tuple of two ints or floats, optional
+                The allowed mass range of the tag-probe pairs.
+                For cut and count efficiencies, it is a single value representing the mass window around the Z mass.
+                For invariant masses to be fit with a Sig+Bkg model, it is a tuple of two values representing the mass range.
+                If None, the default is 30 GeV around the Z mass for cut and count efficiencies and 50-130 GeV range otherwise.
+                The default is None.
+            plateau_cut : int or float, optional
+                Only used if `pt_eta_phi_1d` is True.
+                The Pt threshold to use to ensure that we are on the efficiency plateau for eta and phi histograms.
+                The default None, meaning that no extra cut is applied and the activation region is included in those histograms.
+            eta_regions_pt : dict, optional
+                Only used if `pt_eta_phi_1d` is True.
+                A dictionary of the form `{"name": [etamin, etamax], ...}`
+                where name is the name of the region and etamin and etamax are the absolute eta bounds.
+                The Pt histograms will be split into those eta regions.
+                The default is to avoid the ECAL transition region meaning |eta| < 1.4442 or 1.566 < |eta| < 2.5.
+            eta_regions_eta : dict, optional
+                Only used if `pt_eta_phi_1d` is True.
+                A dictionary of the form `{"name": [etamin, etamax], ...}`
+                where name is the name of the region and etamin and etamax are the absolute eta bounds.
+                The Eta histograms will be split into those eta regions.
+                The default is to use the entire |eta| < 2.5 region.
+            eta_regions_phi : dict, optional
+                Only used if `pt_eta_phi_1d` is True.
+                A dictionary of the form `{"name": [etamin, etamax], ...}`
+                where name is the name of the region and etamin and etamax are the absolute eta bounds.
+                The Phi histograms will be split into those eta regions.
+                The default is to use the entire |eta| < 2.5 region.
+            vars: list, optional
+                The variables to fill the histograms with. The default is ["el_pt", "el_eta", "el_phi"].
+            uproot_options : dict, optional
+                Options to pass to uproot. Pass at least {"allow_read_errors_with_report": True} to turn on file access reports.
+            compute : bool, optional
+                Whether to return the computed hist.Hist histograms or the delayed hist.dask.Hist histograms.
+                The default is False.
+            scheduler : str, optional
+                The dask scheduler to use. The default is None.
+                Only used if compute is True.
+            progress : bool, optional
+                Whether to show a progress bar if `compute` is True. The default is False.
+                Only meaningful if compute is True and no distributed Client is used.
 
-            return computed[0]
+        Returns
+        -------
+            A tuple of the form (histograms, report) if `allow_read_errors_with_report` is True, otherwise just histograms.
+            histograms : dict of dicts of the same form as fileset where for each dataset a dictionary
+                of the form `{"filter": histograms, ...}` is present, where `histograms` has the same form
+                as the output of `get_1d_pt_eta_phi_tnp_histograms` or `get_nd_tnp_histograms`.
+            report: dict of awkward arrays of the same form as fileset.
+                For each dataset an awkward array that contains information about the file access is present.
+        """
+        if self.filters is None:
+            raise ValueError("filters must be specified during class initialization to use this method.")
+        if filters is None:
+            filters = self.filters
+        mass_range, vars, uproot_options = self._resolve_kwargs(cut_and_count=cut_and_count, mass_range=mass_range, vars=vars, uproot_options=uproot_options)
+
+        data_manipulation = partial(
+            self._make_cutncount_histograms if cut_and_count else self._make_mll_histograms,
+            filter=list(filters),
+            pt_eta_phi_1d=pt_eta_phi_1d,
+            mass_range=mass_range,
+            vars=vars,
+            plateau_cut=plateau_cut,
+            eta_regions_pt=eta_regions_pt,
+            eta_regions_eta=eta_regions_eta,
+            eta_regions_phi=eta_regions_phi,
+        )
+
+        import egamma_tnp
+
+        cache_key = (
+            "get_histograms_multi_filter",
+            tuple(filters),
+            cut_and_count,
+            pt_eta_phi_1d,
+            mass_range,
+            tuple(vars) if isinstance(vars, list) else vars,
+            plateau_cut,
+            repr(eta_regions_pt),
+            repr(eta_regions_eta),
+            repr(eta_regions_phi),
+            # the fill helpers read egamma_tnp.binning at graph-build time, so a
+            # cached graph is only valid for the binning revision it was built with
+            egamma_tnp.binning._revision,
+        )
+        to_compute = self._build_to_compute(data_manipulation, uproot_options, cache_key=cache_key)
+        if compute:
+            return self._compute(to_compute, scheduler=scheduler, progress=progress)
 
         return to_compute
 
-    def _make_passing_and_failing_probes(self, events, filter, cut_and_count, mass_range, vars):
-        probes = self.find_probes(events, cut_and_count=cut_and_count, mass_range=mass_range, vars=vars)
+    def _split_passing_and_failing_probes(self, probes, filter, vars):
+        """Split the probes into passing and failing probes for a given filter.
+
+        The filter mask and the output fields are computed once and reused for both outputs
+        so that the split adds as few tasks as possible to the graph.
+        """
+        is_passing_probe = probes[filter]
+        output_fields = [x for x in probes.fields if x not in self.filters]
+        candidates = probes[output_fields]
         if "NanoAOD" in self.__class__.__name__:
-            has_passing_probe = dak.any(probes[filter], axis=1)
-            has_failing_probe = dak.any(~probes[filter], axis=1)
-            passing_probes = probes[has_passing_probe]
-            failing_probes = probes[has_failing_probe]
+            has_passing_probe = dak.any(is_passing_probe, axis=1)
+            has_failing_probe = dak.any(~is_passing_probe, axis=1)
+            passing_probes = candidates[has_passing_probe]
+            failing_probes = candidates[has_failing_probe]
+            passing_locs = is_passing_probe[has_passing_probe]
+            failing_locs = ~is_passing_probe[has_failing_probe]
             for var in vars:
                 if var.startswith(("el_", "tag_Ele_", "ph_")):
-                    passing_probes[var] = passing_probes[var][passing_probes[filter]]
-                    failing_probes[var] = failing_probes[var][~failing_probes[filter]]
+                    passing_probes[var] = passing_probes[var][passing_locs]
+                    failing_probes[var] = failing_probes[var][failing_locs]
             if "pair_mass" in probes.fields:
-                passing_probes["pair_mass"] = passing_probes["pair_mass"][passing_probes[filter]]
-                failing_probes["pair_mass"] = failing_probes["pair_mass"][~failing_probes[filter]]
-            passing_probes = passing_probes[[x for x in passing_probes.fields if x not in self.filters]]
-            failing_probes = failing_probes[[x for x in failing_probes.fields if x not in self.filters]]
+                passing_probes["pair_mass"] = passing_probes["pair_mass"][passing_locs]
+                failing_probes["pair_mass"] = failing_probes["pair_mass"][failing_locs]
         else:
-            passing_probes = probes[probes[filter]][[x for x in probes.fields if x not in self.filters]]
-            failing_probes = probes[~probes[filter]][[x for x in probes.fields if x not in self.filters]]
+            if isinstance(candidates, ak.Array):
+                # a contiguous flat bool array keeps the kernel at a single compiled signature
+                mask = np.ascontiguousarray(ak.to_numpy(is_passing_probe, allow_missing=False), dtype=np.bool_)
+                pass_indices, fail_indices = split_mask_indices(mask)
+                # IndexedArray overlays share the candidate columns instead of copying them;
+                # only the fields actually read downstream are materialized
+                layout = ak.to_layout(candidates)
+                passing_probes = ak.Array(ak.contents.IndexedArray(ak.index.Index64(pass_indices), layout))
+                failing_probes = ak.Array(ak.contents.IndexedArray(ak.index.Index64(fail_indices), layout))
+            else:
+                passing_probes = candidates[is_passing_probe]
+                failing_probes = candidates[~is_passing_probe]
 
         return {"passing": passing_probes, "failing": failing_probes}
 
+    def _make_passing_and_failing_probes(self, events, filter, cut_and_count, mass_range, vars):
+        probes = self.find_probes(events, cut_and_count=cut_and_count, mass_range=mass_range, vars=vars, needed_filters={filter})
+        return self._split_passing_and_failing_probes(probes, filter, vars=vars)
+
     def _make_cutncount_histograms(
         self,
         events,
@@ -600,31 +796,34 @@ class BaseTagNProbe:
         eta_regions_eta,
         eta_regions_phi,
     ):
-        from egamma_tnp.utils import (
-            fill_nd_cutncount_histograms,
-            fill_pt_eta_phi_cutncount_histograms,
-        )
+        needed_filters = {filter} if isinstance(filter, str) else set(filter)
+        probes = self.find_probes(events, cut_and_count=True, mass_range=mass_range, vars=vars, needed_filters=needed_filters)
+        histograms = {}
+        for f in [filter] if isinstance(filter, str) else filter:
+            p_and_f = self._split_passing_and_failing_probes(probes, f, vars=vars)
+            passing_probes = p_and_f["passing"]
+            failing_probes = p_and_f["failing"]
+
+            if pt_eta_phi_1d:
+                histograms[f] = fill_pt_eta_phi_cutncount_histograms(
+                    passing_probes,
+                    failing_probes,
+                    plateau_cut=plateau_cut,
+                    eta_regions_pt=eta_regions_pt,
+                    eta_regions_eta=eta_regions_eta,
+                    eta_regions_phi=eta_regions_phi,
+                    vars=vars,
+                )
+            else:
+                histograms[f] = fill_nd_cutncount_histograms(
+                    passing_probes,
+                    failing_probes,
+                    vars=vars,
+                )
 
-        p_and_f = self._make_passing_and_failing_probes(events, filter, cut_and_count=True, mass_range=mass_range, vars=vars)
-        passing_probes = p_and_f["passing"]
-        failing_probes = p_and_f["failing"]
-
-        if pt_eta_phi_1d:
-            return fill_pt_eta_phi_cutncount_histograms(
-                passing_probes,
-                failing_probes,
-                plateau_cut=plateau_cut,
-                eta_regions_pt=eta_regions_pt,
-                eta_regions_eta=eta_regions_eta,
-                eta_regions_phi=eta_regions_phi,
-                vars=vars,
-            )
-        else:
-            return fill_nd_cutncount_histograms(
-                passing_probes,
-                failing_probes,
-                vars=vars,
-            )
+        if isinstance(filter, str):
+            return histograms[filter]
+        return histograms
 
     def _make_mll_histograms(
         self,
@@ -638,28 +837,31 @@ class BaseTagNProbe:
         eta_regions_eta,
         eta_regions_phi,
     ):
-        from egamma_tnp.utils import (
-            fill_nd_mll_histograms,
-            fill_pt_eta_phi_mll_histograms,
-        )
-
-        p_and_f = self._make_passing_and_failing_probes(events, filter, cut_and_count=False, mass_range=mass_range, vars=vars)
-        passing_probes = p_and_f["passing"]
-        failing_probes = p_and_f["failing"]
-
-        if pt_eta_phi_1d:
-            return fill_pt_eta_phi_mll_histograms(
-                passing_probes,
-                failing_probes,
-                plateau_cut=plateau_cut,
-                eta_regions_pt=eta_regions_pt,
-                eta_regions_eta=eta_regions_eta,
-                eta_regions_phi=eta_regions_phi,
-                vars=vars,
-            )
-        else:
-            return fill_nd_mll_histograms(
-                passing_probes,
-                failing_probes,
-                vars=vars,
-            )
+        needed_filters = {filter} if isinstance(filter, str) else set(filter)
+        probes = self.find_probes(events, cut_and_count=False, mass_range=mass_range, vars=vars, needed_filters=needed_filters)
+        histograms = {}
+        for f in [filter] if isinstance(filter, str) else filter:
+            p_and_f = self._split_passing_and_failing_probes(probes, f, vars=vars)
+            passing_probes = p_and_f["passing"]
+            failing_probes = p_and_f["failing"]
+
+            if pt_eta_phi_1d:
+                histograms[f] = fill_pt_eta_phi_mll_histograms(
+                    passing_probes,
+                    failing_probes,
+                    plateau_cut=plateau_cut,
+                    eta_regions_pt=eta_regions_pt,
+                    eta_regions_eta=eta_regions_eta,
+                    eta_regions_phi=eta_regions_phi,
+                    vars=vars,
+                )
+            else:
+                histograms[f] = fill_nd_mll_histograms(
+                    passing_probes,
+                    failing_probes,
+                    vars=vars,
+                )
+
+        if isinstance(filter, str):
+            return histograms[filter]
+        return histograms
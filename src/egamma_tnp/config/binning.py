@@ -15,6 +15,8 @@ class Binning:
             json.dump(default_data, rf, indent=4)
 
         self.runtime_config = self.load_config(self.runtime_filename)
+        # bumped on every mutation so cached histogram graphs can detect stale binnings
+        self._revision = 0
 
     def load_config(self, filename):
         with open(filename) as f:
@@ -27,11 +29,13 @@ class Binning:
     def set(self, key, value):
         # Only updates the user configuration
         self.runtime_config[key] = value
+        self._revision += 1
         self.save_user_config()
 
     def reset(self, key):
         # Only updates the user configuration
         self.runtime_config[key] = self.load_config(self.default_filename)[key]
+        self._revision += 1
         self.save_user_config()
 
     def get(self, key):
@@ -41,4 +45,5 @@ class Binning:
     def reset_all(self):
         # Only updates the user configuration
         self.runtime_config = self.load_config(self.default_filename)
+        self._revision += 1
         self.save_user_config()
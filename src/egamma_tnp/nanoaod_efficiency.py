@@ -4,7 +4,6 @@ import awkward as ak  # noqa: F401
 import dask_awkward as dak
 import numpy as np  # noqa: F401
 from coffea.analysis_tools import Weights
-from coffea.lumi_tools import LumiMask
 from coffea.nanoevents import NanoAODSchema
 
 from egamma_tnp._base_tagnprobe import BaseTagNProbe
@@ -150,12 +149,9 @@ class ElectronTagNProbeFromNanoAOD(BaseTagNProbe):
                         raise ValueError("A trigger Pt threshold must be provided for all trigger filters.")
 
     def __repr__(self):
-        n_of_files = 0
-        for dataset in self.fileset.values():
-            n_of_files += len(dataset["files"])
-        return f"ElectronTagNProbeFromNanoAOD(Filters: {self.filters}, Number of files: {n_of_files}, Golden JSON: {self.goldenjson})"
+        return f"ElectronTagNProbeFromNanoAOD(Filters: {self.filters}, Number of files: {self._n_files}, Golden JSON: {self.goldenjson})"
 
-    def find_probes(self, events, cut_and_count, mass_range, vars):
+    def find_probes(self, events, cut_and_count, mass_range, vars, needed_filters=None):
         if self.use_sc_eta:
             if "superclusterEta" in events.Electron.fields:
                 events["Electron", "eta_to_use"] = events.Electron.superclusterEta
@@ -169,9 +165,8 @@ class ElectronTagNProbeFromNanoAOD(BaseTagNProbe):
             events["Electron", "phi_to_use"] = events.Electron.phi
         if self.extra_filter is not None:
             events = self.extra_filter(events, **self.extra_filter_args)
-        if self.goldenjson is not None:
-            lumimask = LumiMask(self.goldenjson)
-            mask = lumimask(events.run, events.luminosityBlock)
+        if self._lumimask is not None:
+            mask = self._lumimask(events.run, events.luminosityBlock)
             events = events[mask]
 
         good_events = events[events.HLT.Ele30_WPTight_Gsf]
@@ -187,11 +182,11 @@ class ElectronTagNProbeFromNanoAOD(BaseTagNProbe):
         else:
             pass_cutbased_id_probes = True
         if self.extra_tags_mask is not None:
-            pass_tag_mask = eval(self.extra_tags_mask)
+            pass_tag_mask = eval(self._extra_tags_mask_code)
         else:
             pass_tag_mask = True
         if self.extra_probes_mask is not None:
-            pass_probe_mask = eval(self.extra_probes_mask)
+            pass_probe_mask = eval(self._extra_probes_mask_code)
         else:
             pass_probe_mask = True
         zcands = zcands[pass_tight_id_tags & pass_cutbased_id_probes & pass_tag_mask & pass_probe_mask]
@@ -205,20 +200,32 @@ class ElectronTagNProbeFromNanoAOD(BaseTagNProbe):
             pass_eta_ebeegap_probes = (abs(probes.eta_to_use) < 1.4442) | (abs(probes.eta_to_use) > 1.566)
             zcands = zcands[pass_eta_ebeegap_probes]
 
+        if self.filters is not None and needed_filters is not None:
+            indices = [i for i, f in enumerate(self.filters) if f in needed_filters]
+            filters = [self.filters[i] for i in indices]
+            is_photon_filter = [self.is_photon_filter[i] for i in indices]
+            filterbit = [self.filterbit[i] for i in indices]
+            trigger_pt = [self.trigger_pt[i] for i in indices]
+        else:
+            filters = self.filters
+            is_photon_filter = self.is_photon_filter
+            filterbit = self.filterbit
+            trigger_pt = self.trigger_pt
+
         passing_locs, all_probe_events = ElectronTagNProbeFromNanoAOD._process_zcands(
             zcands=zcands,
             good_events=good_events,
-            trigger_pt=self.trigger_pt,
+            trigger_pt=trigger_pt,
             pt_tags=self.tags_pt_cut,
             pt_probes=self.probes_pt_cut,
             abseta_tags=self.tags_abseta_cut,
             abseta_probes=self.probes_abseta_cut,
-            filterbit=self.filterbit,
+            filterbit=filterbit,
             cut_and_count=cut_and_count,
             mass_range=mass_range,
-            filters=self.filters,
+            filters=filters,
             require_event_to_pass_hlt_filter=self.require_event_to_pass_hlt_filter,
-            is_photon_filter=self.is_photon_filter,
+            is_photon_filter=is_photon_filter,
         )
 
         if vars == "all":
@@ -318,15 +325,12 @@ class ElectronTagNProbeFromNanoAOD(BaseTagNProbe):
         dr = tags.delta_r(probes)
         mass = (tags + probes).mass
         if mass_range is None:
-            if cut_and_count:
-                in_mass_window = abs(mass - 91.1876) < 30
-            else:
-                in_mass_window = (mass > 50) & (mass < 130)
+            mass_range = 30 if cut_and_count else (50, 130)
+        if cut_and_count:
+            lo, hi = 91.1876 - mass_range, 91.1876 + mass_range
         else:
-            if cut_and_count:
-                in_mass_window = abs(mass - 91.1876) < mass_range
-            else:
-                in_mass_window = (mass > mass_range[0]) & (mass < mass_range[1])
+            lo, hi = mass_range
+        in_mass_window = (mass > lo) & (mass < hi)
         opposite_charge = tags.charge * probes.charge == -1
         isZ = in_mass_window & opposite_charge
         dr_condition = dr > 0.0
@@ -513,12 +517,9 @@ class PhotonTagNProbeFromNanoAOD(BaseTagNProbe):
                         raise ValueError("A trigger Pt threshold must be provided for all trigger filters.")
 
     def __repr__(self):
-        n_of_files = 0
-        for dataset in self.fileset.values():
-            n_of_files += len(dataset["files"])
-        return f"PhotonTagNProbeFromNanoAOD(Filters: {self.filters}, Number of files: {n_of_files}, Golden JSON: {self.goldenjson})"
+        return f"PhotonTagNProbeFromNanoAOD(Filters: {self.filters}, Number of files: {self._n_files}, Golden JSON: {self.goldenjson})"
 
-    def find_probes(self, events, cut_and_count, mass_range, vars):
+    def find_probes(self, events, cut_and_count, mass_range, vars, needed_filters=None):
         if self.use_sc_eta:
             if "superclusterEta" not in events.Photon.fields:
                 events["Photon", "superclusterEta"] = calculate_photon_SC_eta(events.Photon, events.PV)
@@ -538,9 +539,8 @@ class PhotonTagNProbeFromNanoAOD(BaseTagNProbe):
             events["Electron", "phi_to_use"] = events.Electron.phi
         if self.extra_filter is not None:
             events = self.extra_filter(events, **self.extra_filter_args)
-        if self.goldenjson is not None:
-            lumimask = LumiMask(self.goldenjson)
-            mask = lumimask(events.run, events.luminosityBlock)
+        if self._lumimask is not None:
+            mask = self._lumimask(events.run, events.luminosityBlock)
             events = events[mask]
 
         # keep until new coffea release
@@ -566,11 +566,11 @@ class PhotonTagNProbeFromNanoAOD(BaseTagNProbe):
         else:
             pass_cutbased_id_probes = True
         if self.extra_tags_mask is not None:
-            pass_tag_mask = eval(self.extra_tags_mask)
+            pass_tag_mask = eval(self._extra_tags_mask_code)
         else:
             pass_tag_mask = True
         if self.extra_probes_mask is not None:
-            pass_probe_mask = eval(self.extra_probes_mask)
+            pass_probe_mask = eval(self._extra_probes_mask_code)
         else:
             pass_probe_mask = True
         zcands = zcands[pass_tight_id_tags & pass_cutbased_id_probes & pass_tag_mask & pass_probe_mask]
@@ -584,20 +584,32 @@ class PhotonTagNProbeFromNanoAOD(BaseTagNProbe):
             pass_eta_ebeegap_probes = (abs(probes.eta_to_use) < 1.4442) | (abs(probes.eta_to_use) > 1.566)
             zcands = zcands[pass_eta_ebeegap_probes]
 
+        if self.filters is not None and needed_filters is not None:
+            indices = [i for i, f in enumerate(self.filters) if f in needed_filters]
+            filters = [self.filters[i] for i in indices]
+            is_electron_filter = [self.is_electron_filter[i] for i in indices]
+            filterbit = [self.filterbit[i] for i in indices]
+            trigger_pt = [self.trigger_pt[i] for i in indices]
+        else:
+            filters = self.filters
+            is_electron_filter = self.is_electron_filter
+            filterbit = self.filterbit
+            trigger_pt = self.trigger_pt
+
         passing_locs, all_probe_events = PhotonTagNProbeFromNanoAOD._process_zcands(
             zcands=zcands,
             good_events=good_events,
-            trigger_pt=self.trigger_pt,
+            trigger_pt=trigger_pt,
             pt_tags=self.tags_pt_cut,
             pt_probes=self.probes_pt_cut,
             abseta_tags=self.tags_abseta_cut,
             abseta_probes=self.probes_abseta_cut,
-            filterbit=self.filterbit,
+            filterbit=filterbit,
             cut_and_count=cut_and_count,
             mass_range=mass_range,
-            filters=self.filters,
+            filters=filters,
             require_event_to_pass_hlt_filter=self.require_event_to_pass_hlt_filter,
-            is_electron_filter=self.is_electron_filter,
+            is_electron_filter=is_electron_filter,
             start_from_diphotons=self.start_from_diphotons,
         )
 
@@ -707,15 +719,12 @@ class PhotonTagNProbeFromNanoAOD(BaseTagNProbe):
         dr = tags.delta_r(probes)
         mass = (tags + probes).mass
         if mass_range is None:
-            if cut_and_count:
-                in_mass_window = abs(mass - 91.1876) < 30
-            else:
-                in_mass_window = (mass > 50) & (mass < 130)
+            mass_range = 30 if cut_and_count else (50, 130)
+        if cut_and_count:
+            lo, hi = 91.1876 - mass_range, 91.1876 + mass_range
         else:
-            if cut_and_count:
-                in_mass_window = abs(mass - 91.1876) < mass_range
-            else:
-                in_mass_window = (mass > mass_range[0]) & (mass < mass_range[1])
+            lo, hi = mass_range
+        in_mass_window = (mass > lo) & (mass < hi)
         # Use this unless we choose to pixel match the probes as well
         opposite_charge = True
         # opposite_charge = tags.charge * probes.charge == -1
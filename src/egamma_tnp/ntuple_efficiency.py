@@ -1,14 +1,141 @@
 from __future__ import annotations
 
-import awkward as ak  # noqa: F401
+from functools import lru_cache
+
+import awkward as ak
 import dask_awkward as dak
-import numpy as np  # noqa: F401
-from coffea.lumi_tools import LumiMask
+import numba
+import numpy as np
 from coffea.nanoevents import BaseSchema
 
 from egamma_tnp._base_tagnprobe import BaseTagNProbe
 from egamma_tnp.utils.pileup import create_correction, get_pileup_weight, load_correction
 
+_Z_MASS = 91.1876
+_DEFAULT_MASS_WINDOW = 30
+_DEFAULT_MASS_BOUNDS = (50, 130)
+
+
+@lru_cache(maxsize=None)
+def _make_selection_kernel(tags_pt_cut, tags_abseta_cut, probes_abseta_cut, avoid_gap_tags, avoid_gap_probes, check_charge):
+    """Compile a kernel fusing the kinematic tag and probe cuts into one pass.
+
+    The cut values and the gap/charge switches are baked into the closure as
+    compile-time constants, so numba folds them into the compare instructions
+    and drops the disabled branches entirely; the cache hands back the same
+    compiled kernel for every instance sharing a cut configuration.
+
+    The opposite-charge requirement is expressed as ``tag_q != probe_q``,
+    which is equivalent to ``tag_q * probe_q == -1`` since the charge
+    columns only ever hold +1 or -1, and avoids the multiply.
+    """
+
+    @numba.njit
+    def kernel(tag_eta, tag_pt, tag_q, probe_eta, probe_q):
+        out = np.empty(tag_eta.size, dtype=np.bool_)
+        for i in range(tag_eta.size):
+            tag_abseta = abs(tag_eta[i])
+            probe_abseta = abs(probe_eta[i])
+            keep = (tag_pt[i] > tags_pt_cut) and (tag_abseta < tags_abseta_cut) and (probe_abseta < probes_abseta_cut)
+            if check_charge:
+                keep = keep and (tag_q[i] != probe_q[i])
+            if avoid_gap_tags:
+                keep = keep and ((tag_abseta < 1.4442) or (tag_abseta > 1.566))
+            if avoid_gap_probes:
+                keep = keep and ((probe_abseta < 1.4442) or (probe_abseta > 1.566))
+            out[i] = keep
+        return out
+
+    return kernel
+
+
+@lru_cache(maxsize=None)
+def _make_probe_kernel(probes_pt_cut, mass_lo, mass_hi, use_cutbased_id):
+    """Compile a kernel fusing the probe-quality cuts with the kinematic mask.
+
+    Used on the numpy backend to combine the mass window, probe pt cut,
+    optional cutbased ID and the precomputed kinematic selection in a single
+    pass instead of four separate vectorized compares plus ANDs.
+    """
+
+    @numba.njit
+    def kernel(selection, probe_pt, pair_mass, cutbased_id):
+        out = np.empty(probe_pt.size, dtype=np.bool_)
+        for i in range(probe_pt.size):
+            keep = selection[i] and (pair_mass[i] > mass_lo) and (pair_mass[i] < mass_hi) and (probe_pt[i] > probes_pt_cut)
+            if use_cutbased_id:
+                keep = keep and (cutbased_id[i] == 1)
+            out[i] = keep
+        return out
+
+    return kernel
+
+
+def _fused_probe_mask(events, probe_pt, probes_pt_cut, mass_lo, mass_hi, cutbased_id, selection_mask):
+    """Combine the probe-quality cuts with the kinematic selection mask.
+
+    Numpy-backed events go through the compiled probe kernel in one pass;
+    dask arrays keep the per-op expression so column projection stays intact.
+    """
+    if isinstance(events, ak.Array):
+        kernel = _make_probe_kernel(probes_pt_cut, mass_lo, mass_hi, bool(cutbased_id))
+        if cutbased_id:
+            cutid = ak.to_numpy(events[cutbased_id])
+        else:
+            cutid = np.empty(0, dtype=np.int64)
+        selection = np.asarray(selection_mask) if selection_mask is not None else np.ones(len(events), dtype=np.bool_)
+        return kernel(selection, ak.to_numpy(probe_pt), ak.to_numpy(events.pair_mass), cutid)
+    probe_mask = (events.pair_mass > mass_lo) & (events.pair_mass < mass_hi) & (probe_pt > probes_pt_cut)
+    if cutbased_id:
+        probe_mask = probe_mask & (events[cutbased_id] == 1)
+    if selection_mask is not None:
+        probe_mask = selection_mask & probe_mask
+    return probe_mask
+
+
+def _dask_selection_mask(
+    tag_eta, tag_pt, tag_q, probe_eta, probe_q, tags_pt_cut, tags_abseta_cut, probes_abseta_cut, avoid_gap_tags, avoid_gap_probes, check_charge
+):
+    """Wrapper for the specialized selection kernel to be used with map_partitions"""
+    ak.typetracer.touch_data(tag_eta)
+    ak.typetracer.touch_data(tag_pt)
+    ak.typetracer.touch_data(probe_eta)
+    if check_charge:
+        ak.typetracer.touch_data(tag_q)
+        ak.typetracer.touch_data(probe_q)
+    if ak.backend(tag_eta) == "typetracer":
+        return ak.Array(ak.Array([True]).layout.to_typetracer(forget_length=True))
+    if check_charge:
+        tag_q, probe_q = ak.to_numpy(tag_q), ak.to_numpy(probe_q)
+    else:
+        # the untouched charge columns are pruned by the optimizer, so hand
+        # the kernel typed placeholders it will never index into
+        tag_q = probe_q = np.empty(0, dtype=np.int32)
+    kernel = _make_selection_kernel(tags_pt_cut, tags_abseta_cut, probes_abseta_cut, avoid_gap_tags, avoid_gap_probes, check_charge)
+    return kernel(
+        ak.to_numpy(tag_eta),
+        ak.to_numpy(tag_pt),
+        tag_q,
+        ak.to_numpy(probe_eta),
+        probe_q,
+    )
+
+
+def _compute_passing_locs(all_probe_events, filters):
+    """Compute the per-filter passing flags of the probe events.
+
+    For eager numpy-backed events all comparisons are written into one
+    preallocated boolean matrix, so the filter columns are traversed in a
+    single vectorized pass each. Dask arrays keep the per-filter comparison
+    so that column projection stays intact.
+    """
+    if isinstance(all_probe_events, ak.Array):
+        packed = np.empty((len(filters), len(all_probe_events)), dtype=np.bool_)
+        for i, filter in enumerate(filters):
+            np.equal(ak.to_numpy(all_probe_events[filter]), 1, out=packed[i])
+        return {filter: packed[i] for i, filter in enumerate(filters)}
+    return {filter: (all_probe_events[filter] == 1) for filter in filters}
+
 
 class ElectronTagNProbeFromNTuples(BaseTagNProbe):
     def __init__(
@@ -94,75 +221,72 @@ class ElectronTagNProbeFromNTuples(BaseTagNProbe):
         )
 
     def __repr__(self):
-        n_of_files = 0
-        for dataset in self.fileset.values():
-            n_of_files += len(dataset["files"])
-        return f"ElectronTagNProbeFromNTuples(Filters: {self.filters}, Number of files: {n_of_files}, Golden JSON: {self.goldenjson})"
-
-    def _find_passing_events(self, events, cut_and_count, mass_range):
-        pass_pt_probes = events.el_pt > self.probes_pt_cut
-        if self.cutbased_id:
-            pass_cutbased_id = events[self.cutbased_id] == 1
-        else:
-            pass_cutbased_id = True
-        if mass_range is not None:
-            if cut_and_count:
-                in_mass_window = abs(events.pair_mass - 91.1876) < mass_range
-            else:
-                in_mass_window = (events.pair_mass > mass_range[0]) & (events.pair_mass < mass_range[1])
+        return f"ElectronTagNProbeFromNTuples(Filters: {self.filters}, Number of files: {self._n_files}, Golden JSON: {self.goldenjson})"
+
+    def _find_passing_events(self, events, cut_and_count, mass_range, selection_mask=None, needed_filters=None):
+        if mass_range is None:
+            mass_range = _DEFAULT_MASS_WINDOW if cut_and_count else _DEFAULT_MASS_BOUNDS
+        if cut_and_count:
+            lo, hi = _Z_MASS - mass_range, _Z_MASS + mass_range
         else:
-            if cut_and_count:
-                in_mass_window = abs(events.pair_mass - 91.1876) < 30
-            else:
-                in_mass_window = (events.pair_mass > 50) & (events.pair_mass < 130)
-        all_probe_events = events[pass_cutbased_id & in_mass_window & pass_pt_probes]
+            lo, hi = mass_range
+        probe_mask = _fused_probe_mask(events, events.el_pt, self.probes_pt_cut, lo, hi, self.cutbased_id, selection_mask)
+        all_probe_events = events[probe_mask]
         if self.filters is not None:
-            passing_locs = {filter: (all_probe_events[filter] == 1) for filter in self.filters}
+            filters = self.filters if needed_filters is None else [f for f in self.filters if f in needed_filters]
+            passing_locs = _compute_passing_locs(all_probe_events, filters)
         else:
             passing_locs = {}
 
         return passing_locs, all_probe_events
 
-    def find_probes(self, events, cut_and_count, mass_range, vars):
-        if self.use_sc_eta:
-            events["el_eta_to_use"] = events.el_sc_eta
-            events["tag_Ele_eta_to_use"] = events.tag_sc_eta
-        else:
-            events["el_eta_to_use"] = events.el_eta
-            events["tag_Ele_eta_to_use"] = events.tag_Ele_eta
-        if self.use_sc_phi:
-            events["el_phi_to_use"] = events.el_sc_phi
-        else:
-            events["el_phi_to_use"] = events.el_phi
+    def find_probes(self, events, cut_and_count, mass_range, vars, needed_filters=None):
         if self.extra_filter is not None:
             events = self.extra_filter(events, **self.extra_filter_args)
-        if self.goldenjson is not None:
-            lumimask = LumiMask(self.goldenjson)
-            mask = lumimask(events.run, events.lumi)
-            events = events[mask]
-
-        if self.avoid_ecal_transition_tags:
-            pass_eta_ebeegap_tags = (abs(events.tag_Ele_eta_to_use) < 1.4442) | (abs(events.tag_Ele_eta_to_use) > 1.566)
-            events = events[pass_eta_ebeegap_tags]
-        if self.avoid_ecal_transition_probes:
-            pass_eta_ebeegap_probes = (abs(events.el_eta_to_use) < 1.4442) | (abs(events.el_eta_to_use) > 1.566)
-            events = events[pass_eta_ebeegap_probes]
-
-        pass_pt_tags = events.tag_Ele_pt > self.tags_pt_cut
-        pass_abseta_tags = abs(events.tag_Ele_eta_to_use) < self.tags_abseta_cut
-        pass_abseta_probes = abs(events.el_eta_to_use) < self.probes_abseta_cut
-        opposite_charge = events.tag_Ele_q * events.el_q == -1
-        if self.extra_tags_mask is not None:
-            pass_tag_mask = eval(self.extra_tags_mask)
+        # reference the configured eta source directly instead of duplicating
+        # it into *_eta_to_use columns on the full pre-cut record
+        tag_eta = events.tag_sc_eta if self.use_sc_eta else events.tag_Ele_eta
+        probe_eta = events.el_sc_eta if self.use_sc_eta else events.el_eta
+
+        if isinstance(events, ak.Array):
+            selection_mask = _dask_selection_mask(
+                tag_eta,
+                events.tag_Ele_pt,
+                events.tag_Ele_q,
+                probe_eta,
+                events.el_q,
+                self.tags_pt_cut,
+                self.tags_abseta_cut,
+                self.probes_abseta_cut,
+                self.avoid_ecal_transition_tags,
+                self.avoid_ecal_transition_probes,
+                True,
+            )
         else:
-            pass_tag_mask = True
+            selection_mask = dak.map_partitions(
+                _dask_selection_mask,
+                tag_eta,
+                events.tag_Ele_pt,
+                events.tag_Ele_q,
+                probe_eta,
+                events.el_q,
+                tags_pt_cut=self.tags_pt_cut,
+                tags_abseta_cut=self.tags_abseta_cut,
+                probes_abseta_cut=self.probes_abseta_cut,
+                avoid_gap_tags=self.avoid_ecal_transition_tags,
+                avoid_gap_probes=self.avoid_ecal_transition_probes,
+                check_charge=True,
+            )
+        if self._lumimask is not None:
+            selection_mask = selection_mask & self._lumimask(events.run, events.lumi)
+        if self.extra_tags_mask is not None:
+            selection_mask = selection_mask & eval(self._extra_tags_mask_code)
         if self.extra_probes_mask is not None:
-            pass_probe_mask = eval(self.extra_probes_mask)
-        else:
-            pass_probe_mask = True
-        events = events[pass_pt_tags & pass_abseta_tags & pass_abseta_probes & opposite_charge & pass_tag_mask & pass_probe_mask]
+            selection_mask = selection_mask & eval(self._extra_probes_mask_code)
 
-        passing_locs, all_probe_events = self._find_passing_events(events, cut_and_count=cut_and_count, mass_range=mass_range)
+        passing_locs, all_probe_events = self._find_passing_events(
+            events, cut_and_count=cut_and_count, mass_range=mass_range, selection_mask=selection_mask, needed_filters=needed_filters
+        )
 
         if vars == "all":
             vars_tags = [v for v in all_probe_events.fields if v.startswith("tag_Ele_")]
@@ -171,10 +295,14 @@ class ElectronTagNProbeFromNTuples(BaseTagNProbe):
             if all_probe_events.metadata.get("isMC"):
                 vars = [*vars, "truePU"]
 
-        if cut_and_count:
-            probes = dak.zip({var: all_probe_events[var] for var in vars if "to_use" not in var} | passing_locs)
+        fields = {var: all_probe_events[var] for var in vars if "to_use" not in var}
+        fields.update(passing_locs)
+        if not cut_and_count:
+            fields["pair_mass"] = all_probe_events["pair_mass"]
+        if isinstance(all_probe_events, ak.Array):
+            probes = ak.zip(fields, depth_limit=1)
         else:
-            probes = dak.zip({var: all_probe_events[var] for var in vars if "to_use" not in var} | passing_locs | {"pair_mass": all_probe_events["pair_mass"]})
+            probes = dak.zip(fields, depth_limit=1)
 
         if all_probe_events.metadata.get("isMC"):
             if "pileupJSON" in all_probe_events.metadata:
@@ -274,74 +402,72 @@ class PhotonTagNProbeFromNTuples(BaseTagNProbe):
         )
 
     def __repr__(self):
-        n_of_files = 0
-        for dataset in self.fileset.values():
-            n_of_files += len(dataset["files"])
-        return f"PhotonTagNProbeFromNTuples(Filters: {self.filters}, Number of files: {n_of_files}, Golden JSON: {self.goldenjson})"
-
-    def _find_passing_events(self, events, cut_and_count, mass_range):
-        pass_pt_probes = events.ph_et > self.probes_pt_cut
-        if self.cutbased_id:
-            pass_cutbased_id = events[self.cutbased_id] == 1
-        else:
-            pass_cutbased_id = True
-        if mass_range is not None:
-            if cut_and_count:
-                in_mass_window = abs(events.pair_mass - 91.1876) < mass_range
-            else:
-                in_mass_window = (events.pair_mass > mass_range[0]) & (events.pair_mass < mass_range[1])
+        return f"PhotonTagNProbeFromNTuples(Filters: {self.filters}, Number of files: {self._n_files}, Golden JSON: {self.goldenjson})"
+
+    def _find_passing_events(self, events, cut_and_count, mass_range, selection_mask=None, needed_filters=None):
+        if mass_range is None:
+            mass_range = _DEFAULT_MASS_WINDOW if cut_and_count else _DEFAULT_MASS_BOUNDS
+        if cut_and_count:
+            lo, hi = _Z_MASS - mass_range, _Z_MASS + mass_range
         else:
-            if cut_and_count:
-                in_mass_window = abs(events.pair_mass - 91.1876) < 30
-            else:
-                in_mass_window = (events.pair_mass > 50) & (events.pair_mass < 130)
-        all_probe_events = events[pass_cutbased_id & in_mass_window & pass_pt_probes]
+            lo, hi = mass_range
+        probe_mask = _fused_probe_mask(events, events.ph_et, self.probes_pt_cut, lo, hi, self.cutbased_id, selection_mask)
+        all_probe_events = events[probe_mask]
         if self.filters is not None:
-            passing_locs = {filter: (all_probe_events[filter] == 1) for filter in self.filters}
+            filters = self.filters if needed_filters is None else [f for f in self.filters if f in needed_filters]
+            passing_locs = _compute_passing_locs(all_probe_events, filters)
         else:
             passing_locs = {}
 
         return passing_locs, all_probe_events
 
-    def find_probes(self, events, cut_and_count, mass_range, vars):
-        if self.use_sc_eta:
-            events["ph_eta_to_use"] = events.ph_sc_eta
-            events["tag_Ele_eta_to_use"] = events.tag_sc_eta
-        else:
-            events["ph_eta_to_use"] = events.ph_eta
-            events["tag_Ele_eta_to_use"] = events.tag_Ele_eta
-        if self.use_sc_phi:
-            events["ph_phi_to_use"] = events.ph_sc_phi
-        else:
-            events["ph_phi_to_use"] = events.ph_phi
+    def find_probes(self, events, cut_and_count, mass_range, vars, needed_filters=None):
         if self.extra_filter is not None:
             events = self.extra_filter(events, **self.extra_filter_args)
-        if self.goldenjson is not None:
-            lumimask = LumiMask(self.goldenjson)
-            mask = lumimask(events.run, events.lumi)
-            events = events[mask]
-
-        if self.avoid_ecal_transition_tags:
-            pass_eta_ebeegap_tags = (abs(events.tag_Ele_eta_to_use) < 1.4442) | (abs(events.tag_Ele_eta_to_use) > 1.566)
-            events = events[pass_eta_ebeegap_tags]
-        if self.avoid_ecal_transition_probes:
-            pass_eta_ebeegap_probes = (abs(events.ph_eta_to_use) < 1.4442) | (abs(events.ph_eta_to_use) > 1.566)
-            events = events[pass_eta_ebeegap_probes]
-
-        pass_pt_tags = events.tag_Ele_pt > self.tags_pt_cut
-        pass_abseta_tags = abs(events.tag_Ele_eta_to_use) < self.tags_abseta_cut
-        pass_abseta_probes = abs(events.ph_eta_to_use) < self.probes_abseta_cut
-        if self.extra_tags_mask is not None:
-            pass_tag_mask = eval(self.extra_tags_mask)
+        # reference the configured eta source directly instead of duplicating
+        # it into *_eta_to_use columns on the full pre-cut record
+        tag_eta = events.tag_sc_eta if self.use_sc_eta else events.tag_Ele_eta
+        probe_eta = events.ph_sc_eta if self.use_sc_eta else events.ph_eta
+
+        if isinstance(events, ak.Array):
+            selection_mask = _dask_selection_mask(
+                tag_eta,
+                events.tag_Ele_pt,
+                events.tag_Ele_q,
+                probe_eta,
+                events.tag_Ele_q,
+                self.tags_pt_cut,
+                self.tags_abseta_cut,
+                self.probes_abseta_cut,
+                self.avoid_ecal_transition_tags,
+                self.avoid_ecal_transition_probes,
+                False,
+            )
         else:
-            pass_tag_mask = True
+            selection_mask = dak.map_partitions(
+                _dask_selection_mask,
+                tag_eta,
+                events.tag_Ele_pt,
+                events.tag_Ele_q,
+                probe_eta,
+                events.tag_Ele_q,
+                tags_pt_cut=self.tags_pt_cut,
+                tags_abseta_cut=self.tags_abseta_cut,
+                probes_abseta_cut=self.probes_abseta_cut,
+                avoid_gap_tags=self.avoid_ecal_transition_tags,
+                avoid_gap_probes=self.avoid_ecal_transition_probes,
+                check_charge=False,
+            )
+        if self._lumimask is not None:
+            selection_mask = selection_mask & self._lumimask(events.run, events.lumi)
+        if self.extra_tags_mask is not None:
+            selection_mask = selection_mask & eval(self._extra_tags_mask_code)
         if self.extra_probes_mask is not None:
-            pass_probe_mask = eval(self.extra_probes_mask)
-        else:
-            pass_probe_mask = True
-        events = events[pass_pt_tags & pass_abseta_tags & pass_abseta_probes & pass_tag_mask & pass_probe_mask]
+            selection_mask = selection_mask & eval(self._extra_probes_mask_code)
 
-        passing_locs, all_probe_events = self._find_passing_events(events, cut_and_count=cut_and_count, mass_range=mass_range)
+        passing_locs, all_probe_events = self._find_passing_events(
+            events, cut_and_count=cut_and_count, mass_range=mass_range, selection_mask=selection_mask, needed_filters=needed_filters
+        )
 
         if vars == "all":
             vars_tags = [v for v in all_probe_events.fields if v.startswith("tag_Ele_")]
@@ -350,10 +476,14 @@ class PhotonTagNProbeFromNTuples(BaseTagNProbe):
             if all_probe_events.metadata.get("isMC"):
                 vars = [*vars, "truePU"]
 
-        if cut_and_count:
-            probes = dak.zip({var: all_probe_events[var] for var in vars if "to_use" not in var} | passing_locs)
+        fields = {var: all_probe_events[var] for var in vars if "to_use" not in var}
+        fields.update(passing_locs)
+        if not cut_and_count:
+            fields["pair_mass"] = all_probe_events["pair_mass"]
+        if isinstance(all_probe_events, ak.Array):
+            probes = ak.zip(fields, depth_limit=1)
         else:
-            probes = dak.zip({var: all_probe_events[var] for var in vars if "to_use" not in var} | passing_locs | {"pair_mass": all_probe_events["pair_mass"]})
+            probes = dak.zip(fields, depth_limit=1)
 
         if all_probe_events.metadata.get("isMC"):
             if "pileupJSON" in all_probe_events.metadata:
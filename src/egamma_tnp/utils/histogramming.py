@@ -1,11 +1,33 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 import awkward as ak
 import numpy as np
 import uproot
 from hist import intervals
 
 
+@lru_cache(maxsize=None)
+def _parsed_edges(edges):
+    return np.asarray(edges, dtype=np.float64)
+
+
+def _variable_axis(edges, name, label):
+    import hist
+
+    # hist shares axis metadata between histograms rather than copying it, so a
+    # cached axis instance would let one histogram's relabeling leak into every
+    # other; only the parsed edge array is cached and each call gets a fresh axis
+    return hist.axis.Variable(_parsed_edges(edges), name=name, label=label)
+
+
+def _regular_axis(bins, start, stop, name, label):
+    import hist
+
+    return hist.axis.Regular(bins, start, stop, name=name, label=label)
+
+
 def flatten_array(array):
     """Flatten the probes array.
 
@@ -19,6 +41,16 @@ def flatten_array(array):
         awkward.Array or dask_awkward.Array
             The flattened array.
     """
+    if isinstance(array, ak.Array):
+        layouts = {var: ak.to_layout(array[var]).to_packed() for var in array.fields}
+        if all(isinstance(layout, ak.contents.ListOffsetArray) for layout in layouts.values()):
+            offsets = next(iter(layouts.values())).offsets
+            if all(np.array_equal(layout.offsets.data, offsets.data) for layout in layouts.values()):
+                # all fields share the same list structure, so the flattened record
+                # can be built directly from the list contents without zip+flatten copies
+                length = int(offsets[-1])
+                contents = [layout.content[:length] for layout in layouts.values()]
+                return ak.Array(ak.contents.RecordArray(contents, list(layouts.keys()), length=length))
 
     return ak.flatten(ak.zip({var: array[var] for var in array.fields}), axis=-1)
 
@@ -166,11 +198,11 @@ def fill_pt_eta_phi_cutncount_histograms(
         eta_mask_pt_pass = (abs(eta_pass) > region_pt[0]) & (abs(eta_pass) < region_pt[1])
         eta_mask_pt_fail = (abs(eta_fail) > region_pt[0]) & (abs(eta_fail) < region_pt[1])
         hpt_pass = Hist(
-            hist.axis.Variable(ptbins, name="pt", label="Pt [GeV]"),
+            _variable_axis(tuple(ptbins), "pt", "Pt [GeV]"),
             storage=hist.storage.Weight(),
         )
         hpt_fail = Hist(
-            hist.axis.Variable(ptbins, name="pt", label="Pt [GeV]"),
+            _variable_axis(tuple(ptbins), "pt", "Pt [GeV]"),
             storage=hist.storage.Weight(),
         )
         hpt_pass.fill(pt_pass[eta_mask_pt_pass], weight=passing_probes_weight[eta_mask_pt_pass])
@@ -182,11 +214,11 @@ def fill_pt_eta_phi_cutncount_histograms(
         eta_mask_eta_pass = (abs(eta_pass) > region_eta[0]) & (abs(eta_pass) < region_eta[1])
         eta_mask_eta_fail = (abs(eta_fail) > region_eta[0]) & (abs(eta_fail) < region_eta[1])
         heta_pass = Hist(
-            hist.axis.Variable(etabins, name="eta", label="eta"),
+            _variable_axis(tuple(etabins), "eta", "eta"),
             storage=hist.storage.Weight(),
         )
         heta_fail = Hist(
-            hist.axis.Variable(etabins, name="eta", label="eta"),
+            _variable_axis(tuple(etabins), "eta", "eta"),
             storage=hist.storage.Weight(),
         )
         heta_pass.fill(eta_pass[plateau_mask_pass & eta_mask_eta_pass], weight=passing_probes_weight[plateau_mask_pass & eta_mask_eta_pass])
@@ -198,11 +230,11 @@ def fill_pt_eta_phi_cutncount_histograms(
         eta_mask_phi_pass = (abs(eta_pass) > region_phi[0]) & (abs(eta_pass) < region_phi[1])
         eta_mask_phi_fail = (abs(eta_fail) > region_phi[0]) & (abs(eta_fail) < region_phi[1])
         hphi_pass = Hist(
-            hist.axis.Variable(phibins, name="phi", label="phi"),
+            _variable_axis(tuple(phibins), "phi", "phi"),
             storage=hist.storage.Weight(),
         )
         hphi_fail = Hist(
-            hist.axis.Variable(phibins, name="phi", label="phi"),
+            _variable_axis(tuple(phibins), "phi", "phi"),
             storage=hist.storage.Weight(),
         )
         hphi_pass.fill(phi_pass[plateau_mask_pass & eta_mask_phi_pass], weight=passing_probes_weight[plateau_mask_pass & eta_mask_phi_pass])
@@ -317,13 +349,13 @@ def fill_pt_eta_phi_mll_histograms(
         eta_mask_pt_pass = (abs(eta_pass) > region_pt[0]) & (abs(eta_pass) < region_pt[1])
         eta_mask_pt_fail = (abs(eta_fail) > region_pt[0]) & (abs(eta_fail) < region_pt[1])
         hpt_pass = Hist(
-            hist.axis.Variable(ptbins, name="pt", label="Pt [GeV]"),
-            hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"),
+            _variable_axis(tuple(ptbins), "pt", "Pt [GeV]"),
+            _regular_axis(80, 50, 130, "mll", "mll [GeV]"),
             storage=hist.storage.Weight(),
         )
         hpt_fail = Hist(
-            hist.axis.Variable(ptbins, name="pt", label="Pt [GeV]"),
-            hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"),
+            _variable_axis(tuple(ptbins), "pt", "Pt [GeV]"),
+            _regular_axis(80, 50, 130, "mll", "mll [GeV]"),
             storage=hist.storage.Weight(),
         )
         hpt_pass.fill(pt_pass[eta_mask_pt_pass], mll_pass[eta_mask_pt_pass], weight=passing_probes_weight[eta_mask_pt_pass])
@@ -335,13 +367,13 @@ def fill_pt_eta_phi_mll_histograms(
         eta_mask_eta_pass = (abs(eta_pass) > region_eta[0]) & (abs(eta_pass) < region_eta[1])
         eta_mask_eta_fail = (abs(eta_fail) > region_eta[0]) & (abs(eta_fail) < region_eta[1])
         heta_pass = Hist(
-            hist.axis.Variable(etabins, name="eta", label="eta"),
-            hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"),
+            _variable_axis(tuple(etabins), "eta", "eta"),
+            _regular_axis(80, 50, 130, "mll", "mll [GeV]"),
             storage=hist.storage.Weight(),
         )
         heta_fail = Hist(
-            hist.axis.Variable(etabins, name="eta", label="eta"),
-            hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"),
+            _variable_axis(tuple(etabins), "eta", "eta"),
+            _regular_axis(80, 50, 130, "mll", "mll [GeV]"),
             storage=hist.storage.Weight(),
         )
         eta_mask_pass = plateau_mask_pass & eta_mask_eta_pass
@@ -355,13 +387,13 @@ def fill_pt_eta_phi_mll_histograms(
         eta_mask_phi_pass = (abs(eta_pass) > region_phi[0]) & (abs(eta_pass) < region_phi[1])
         eta_mask_phi_fail = (abs(eta_fail) > region_phi[0]) & (abs(eta_fail) < region_phi[1])
         hphi_pass = Hist(
-            hist.axis.Variable(phibins, name="phi", label="phi"),
-            hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"),
+            _variable_axis(tuple(phibins), "phi", "phi"),
+            _regular_axis(80, 50, 130, "mll", "mll [GeV]"),
             storage=hist.storage.Weight(),
         )
         hphi_fail = Hist(
-            hist.axis.Variable(phibins, name="phi", label="phi"),
-            hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"),
+            _variable_axis(tuple(phibins), "phi", "phi"),
+            _regular_axis(80, 50, 130, "mll", "mll [GeV]"),
             storage=hist.storage.Weight(),
         )
         phi_mask_pass = plateau_mask_pass & eta_mask_phi_pass
@@ -428,7 +460,7 @@ def fill_nd_cutncount_histograms(
             The variable names in the configuration json should be in the form of `"{var}_bins"`."""
         )
 
-    axes = [hist.axis.Variable(egamma_tnp.binning.get(f"{var}_bins"), name=var, label=f"{var.capitalize()}") for var in vars]
+    axes = [_variable_axis(tuple(egamma_tnp.binning.get(f"{var}_bins")), var, f"{var.capitalize()}") for var in vars]
 
     hpass = Hist(*axes, storage=hist.storage.Weight())
     hfail = Hist(*axes, storage=hist.storage.Weight())
@@ -493,8 +525,8 @@ def fill_nd_mll_histograms(
             The variable names in the configuration json should be in the form of `"{var}_bins"`. """
         )
 
-    axes = [hist.axis.Variable(egamma_tnp.binning.get(f"{var}_bins"), name=var, label=f"{var.capitalize()}") for var in vars]
-    axes.append(hist.axis.Regular(80, 50, 130, name="mll", label="mll [GeV]"))
+    axes = [_variable_axis(tuple(egamma_tnp.binning.get(f"{var}_bins")), var, f"{var.capitalize()}") for var in vars]
+    axes.append(_regular_axis(80, 50, 130, "mll", "mll [GeV]"))
 
     hpass = Hist(*axes, storage=hist.storage.Weight())
     hfail = Hist(*axes, storage=hist.storage.Weight())
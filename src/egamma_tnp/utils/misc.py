@@ -38,6 +38,38 @@ def delta_r(eta1, phi1, eta2, phi2):
     return np.hypot(deta, dphi)
 
 
+@numba.njit(cache=True)
+def split_mask_indices(mask):
+    """Convert a boolean mask into passing and failing index arrays in a single pass.
+
+    Parameters
+    ----------
+        mask : np.ndarray
+            A flat boolean array.
+
+    Returns
+    -------
+        (np.ndarray, np.ndarray)
+            The indices where the mask is True and the indices where it is False.
+    """
+    n_pass = 0
+    for i in range(mask.size):
+        if mask[i]:
+            n_pass += 1
+    pass_indices = np.empty(n_pass, dtype=np.int64)
+    fail_indices = np.empty(mask.size - n_pass, dtype=np.int64)
+    n_pass = 0
+    n_fail = 0
+    for i in range(mask.size):
+        if mask[i]:
+            pass_indices[n_pass] = i
+            n_pass += 1
+        else:
+            fail_indices[n_fail] = i
+            n_fail += 1
+    return pass_indices, fail_indices
+
+
 def custom_delta_r(probe, other):
     """Distance in (eta,phi) plane between probe and another object using `eta_to_use` and `phi_to_use`."""
     return delta_r(probe.eta_to_use, probe.phi_to_use, other.eta, other.phi)
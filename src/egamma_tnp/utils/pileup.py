@@ -1,13 +1,79 @@
 from __future__ import annotations
 
+import gzip
+from functools import lru_cache
+
 import correctionlib
 import correctionlib.convert
 import hist
+import numba
 import numpy as np
 import uproot
 from coffea.lookup_tools.correctionlib_wrapper import correctionlib_wrapper
 
+_created_corrections = {}
+
+
+@numba.njit(cache=True)
+def _binned_lookup(values, edges, content):
+    """Evaluate a one-dimensional binned correction with clamped flow in a single pass."""
+    out = np.empty(values.size, dtype=np.float64)
+    for i in range(values.size):
+        x = values[i]
+        if x < edges[0]:
+            out[i] = content[0]
+        elif x >= edges[-1]:
+            out[i] = content[-1]
+        else:
+            # NaN fails both flow guards and searchsorted then points one past
+            # the last bin, so clamp the index to stay in bounds like the
+            # reference correctionlib evaluator does
+            out[i] = content[min(np.searchsorted(edges, x, side="right") - 1, content.size - 1)]
+    return out
+
+
+class binned_correction_wrapper(correctionlib_wrapper):
+    """A correctionlib_wrapper with a numba fast path for one-dimensional binned corrections.
+
+    Single-input binned corrections with scalar bin contents and clamped flow,
+    like the pileup reweighting corrections, are evaluated with a compiled
+    lookup kernel instead of dispatching into correctionlib per array.
+    """
+
+    def __init__(self, payload, edges, content):
+        super().__init__(payload)
+        self._edges = np.asarray(edges, dtype=np.float64)
+        self._content = np.asarray(content, dtype=np.float64)
+
+    def _evaluate(self, *args, **kwargs):
+        if len(args) == 1:
+            return _binned_lookup(np.asarray(args[0], dtype=np.float64), self._edges, self._content)
+        return super()._evaluate(*args, **kwargs)
+
 
+def _extract_binning(corr_model):
+    """Return the (edges, content) of a simple binned correction model, or None if it is not one."""
+    data = corr_model.data
+    if (
+        getattr(data, "nodetype", None) != "binning"
+        or data.flow != "clamp"
+        or len(corr_model.inputs) != 1
+        or not isinstance(data.edges, list)
+        or not all(isinstance(value, (int, float)) for value in data.content)
+    ):
+        return None
+    return data.edges, data.content
+
+
+def _wrap_correction(corr, corr_model):
+    if corr_model is not None:
+        binning = _extract_binning(corr_model)
+        if binning is not None:
+            return binned_correction_wrapper(corr, *binning)
+    return correctionlib_wrapper(corr)
+
+
+@lru_cache(maxsize=None)
 def load_correction(correction_file, name=None):
     ceval = correctionlib.CorrectionSet.from_file(correction_file)
     if name is not None:
@@ -15,10 +81,26 @@ def load_correction(correction_file, name=None):
     else:
         corr = ceval[next(iter(ceval.keys()))]
 
-    return correctionlib_wrapper(corr)
+    corr_model = None
+    try:
+        opener = gzip.open if correction_file.endswith(".gz") else open
+        with opener(correction_file, "rt") as fin:
+            cset_model = correctionlib.schemav2.CorrectionSet.parse_raw(fin.read())
+        corr_model = next(c for c in cset_model.corrections if c.name == corr.name)
+    except Exception:
+        pass
+
+    return _wrap_correction(corr, corr_model)
 
 
 def create_correction(pu_data_histogram, pu_mc_array, outfile=None, normalize_pu_mc_array=False):
+    if outfile is None:
+        cache_key = (pu_data_histogram, np.asarray(pu_mc_array).tobytes(), normalize_pu_mc_array)
+        if cache_key in _created_corrections:
+            return _created_corrections[cache_key]
+    else:
+        cache_key = None
+
     pu_data = uproot.open(pu_data_histogram)["pileup"].to_hist().density()
     pu_mc = pu_mc_array / np.sum(pu_mc_array) if normalize_pu_mc_array else pu_mc_array
     assert len(pu_data) == len(pu_mc), "Data and MC pileup distributions have different lengths"
@@ -52,7 +134,10 @@ def create_correction(pu_data_histogram, pu_mc_array, outfile=None, normalize_pu
     ceval = cset.to_evaluator()
     corr = ceval["Pileup"]
     np.testing.assert_allclose(corr.evaluate(np.arange(len(pu_data), dtype=float)), (pu_data / pu_mc), err_msg="Pileup correction does not match input data")
-    return correctionlib_wrapper(corr)
+    wrapper = _wrap_correction(corr, clibcorr)
+    if cache_key is not None:
+        _created_corrections[cache_key] = wrapper
+    return wrapper
 
 
 def get_pileup_weight(true_pileup, pileup_corr):
@@ -224,3 +224,61 @@ def test_histogramming_non_probe_vars(tag_n_probe_class):
     assert_histograms_equal(hmll1d["eta"]["entire"]["failing"], hmll3d["failing"][-2.5j:2.5j, -2.5j:2.5j:sum, sum, :], flow=False)
 
     egamma_tnp.binning.reset_all()
+
+
+def test_histogramming_binning_update():
+    import egamma_tnp
+
+    fileset = {"sample": {"files": {os.path.abspath("tests/samples/TnPNTuples_el.root"): "fitter_tree"}}}
+    tag_n_probe = ElectronTagNProbeFromNTuples(
+        fileset,
+        ["passHltEle30WPTightGsf"],
+        cutbased_id="passingCutBasedTight122XV1",
+        use_sc_eta=True,
+        tags_pt_cut=30,
+    )
+
+    h1 = tag_n_probe.get_1d_pt_eta_phi_tnp_histograms("passHltEle30WPTightGsf", compute=True)["sample"]
+    old_edges = h1["pt"]["barrel"]["passing"].axes[0].edges
+
+    new_pt_bins = [10, 50, 100, 200]
+    egamma_tnp.binning.set("pt_bins", new_pt_bins)
+    egamma_tnp.binning.set("el_pt_bins", new_pt_bins)
+
+    h2 = tag_n_probe.get_1d_pt_eta_phi_tnp_histograms("passHltEle30WPTightGsf", compute=True)["sample"]
+    hnd = tag_n_probe.get_nd_tnp_histograms("passHltEle30WPTightGsf", compute=True)["sample"]
+
+    assert not np.array_equal(old_edges, new_pt_bins)
+    np.testing.assert_array_equal(h2["pt"]["barrel"]["passing"].axes[0].edges, new_pt_bins)
+    np.testing.assert_array_equal(hnd["passing"].axes[0].edges, new_pt_bins)
+    assert h1["pt"]["barrel"]["passing"].sum(flow=True).value == h2["pt"]["barrel"]["passing"].sum(flow=True).value
+
+    egamma_tnp.binning.reset_all()
+
+
+@pytest.mark.parametrize("pt_eta_phi_1d", [True, False])
+@pytest.mark.parametrize("cut_and_count", [True, False])
+def test_histogramming_multi_filter(cut_and_count, pt_eta_phi_1d):
+    fileset = {"sample": {"files": {os.path.abspath("tests/samples/TnPNTuples_el.root"): "fitter_tree"}}}
+    filters = ["passHltEle30WPTightGsf", "passingCutBasedTight122XV1"]
+    tag_n_probe = ElectronTagNProbeFromNTuples(
+        fileset,
+        filters,
+        cutbased_id="passingCutBasedLoose122XV1",
+        use_sc_eta=True,
+        tags_pt_cut=30,
+    )
+
+    multi = tag_n_probe.get_histograms_multi_filter(filters=filters, cut_and_count=cut_and_count, pt_eta_phi_1d=pt_eta_phi_1d, compute=True)["sample"]
+
+    for filter in filters:
+        if pt_eta_phi_1d:
+            single = tag_n_probe.get_1d_pt_eta_phi_tnp_histograms(filter, cut_and_count=cut_and_count, compute=True)["sample"]
+            for var in single:
+                for region in single[var]:
+                    for status in ("passing", "failing"):
+                        assert_histograms_equal(multi[filter][var][region][status], single[var][region][status], flow=True)
+        else:
+            single = tag_n_probe.get_nd_tnp_histograms(filter, cut_and_count=cut_and_count, compute=True)["sample"]
+            for status in ("passing", "failing"):
+                assert_histograms_equal(multi[filter][status], single[status], flow=True)
@@ -35,6 +35,30 @@ def test_tag_and_probe_electrons():
     assert len(solution[1]) == 113
 
 
+def test_tag_and_probe_electrons_eager():
+    fileset = {"sample": {"files": {os.path.abspath("tests/samples/TnPNTuples_el.root"): "fitter_tree"}}}
+
+    tag_n_probe = ElectronTagNProbeFromNTuples(
+        fileset,
+        ["passingCutBasedTight122XV1"],
+        cutbased_id="passingCutBasedLoose122XV1",
+        use_sc_eta=True,
+        tags_pt_cut=35,
+        probes_pt_cut=27,
+        tags_abseta_cut=2.17,
+    )
+
+    events = NanoEventsFactory.from_root({os.path.abspath("tests/samples/TnPNTuples_el.root"): "fitter_tree"}, schemaclass=BaseSchema, delayed=False).events()
+    vars = ["el_pt", "el_eta", "truePU", "tag_Ele_eta"]
+    probes = tag_n_probe.find_probes(events, cut_and_count=False, mass_range=None, vars=vars)
+    result = tag_n_probe._split_passing_and_failing_probes(probes, "passingCutBasedTight122XV1", vars=vars)
+    solution = tag_n_probe.get_passing_and_failing_probes("passingCutBasedTight122XV1", cut_and_count=False, vars=vars, compute=True)["sample"]
+    assert_eq(result["passing"], solution["passing"])
+    assert_eq(result["failing"], solution["failing"])
+    assert len(result["passing"]) == 414
+    assert len(result["failing"]) == 113
+
+
 def test_tag_and_probe_photons():
     fileset = {"sample": {"files": {os.path.abspath("tests/samples/TnPNTuples_ph.root"): "fitter_tree"}}}
 
@@ -59,3 +83,27 @@ def test_tag_and_probe_photons():
     assert len(result["failing"]) == 73
     assert len(solution[0]) == 372
     assert len(solution[1]) == 73
+
+
+def test_tag_and_probe_photons_eager():
+    fileset = {"sample": {"files": {os.path.abspath("tests/samples/TnPNTuples_ph.root"): "fitter_tree"}}}
+
+    tag_n_probe = PhotonTagNProbeFromNTuples(
+        fileset,
+        ["passingCutBasedTight122XV1"],
+        cutbased_id="passingCutBasedLoose122XV1",
+        use_sc_eta=True,
+        tags_pt_cut=35,
+        probes_pt_cut=27,
+        tags_abseta_cut=2.17,
+    )
+
+    events = NanoEventsFactory.from_root({os.path.abspath("tests/samples/TnPNTuples_ph.root"): "fitter_tree"}, schemaclass=BaseSchema, delayed=False).events()
+    vars = ["ph_et", "ph_eta", "truePU", "tag_Ele_eta"]
+    probes = tag_n_probe.find_probes(events, cut_and_count=False, mass_range=None, vars=vars)
+    result = tag_n_probe._split_passing_and_failing_probes(probes, "passingCutBasedTight122XV1", vars=vars)
+    solution = tag_n_probe.get_passing_and_failing_probes("passingCutBasedTight122XV1", cut_and_count=False, vars=vars, compute=True)["sample"]
+    assert_eq(result["passing"], solution["passing"])
+    assert_eq(result["failing"], solution["failing"])
+    assert len(result["passing"]) == 372
+    assert len(result["failing"]) == 73